@@ -1,5 +1,36 @@
+import asyncio
+import base64
+import functools
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from izaber.log import log
-from izaber.compat import *
+
+# Optional: reads the default route from userspace instead of probing the
+# routing table with a UDP socket when discovering the local address.
+try:
+    import netifaces
+except ImportError:
+    netifaces = None
+
+# How long a cached schema stays valid, how many entries we keep before
+# evicting the least recently used, and how close to expiry (as a fraction
+# of the TTL) an entry has to be before we start refreshing it in the
+# background.
+SCHEMA_TTL = 30 * 60
+SCHEMA_CACHE_MAX = 1000
+SCHEMA_REFRESH_BAND = 0.1
+
+# Attribute names probed by introspection tooling (IPython display hooks
+# and the like) that must never be wrapped into RPC callables.
+PROBE_ATTRIBUTES = frozenset([
+    '_ipython_canary_method_should_not_exist_',
+    '_repr_html_',
+    '_repr_mimebundle_',
+])
 
 METHOD_SHORTHANDS = {
     'schema':           'object.execute.fields_get',
@@ -25,8 +56,12 @@ class ZERPModel(object):
         self.zerp_ = zerp
         self.model_ = model
         self.schema_ = schema
+        # The fully-qualified URI prefix for this model, computed once so
+        # that dispatching a method is a single string concat instead of
+        # joins in both ZERPModel and ZERP.call on every invocation.
+        self._uri_prefix_ = zerp._call_prefix + model + u':'
 
-    def reports_fetch(self, ids, context=None ):
+    def reports_fetch(self, ids, context=None, timeout=30 ):
         """ Request a report be generated then fetch it!
             The return value should be the decoded data file
         """
@@ -34,52 +69,270 @@ class ZERPModel(object):
 
         generated_report_id = self.report(ids,context)
 
-        # The report must be created.
-        # Make sure we can generate the report
+        # The report must be created. Poll with exponential backoff: the
+        # first checks come quickly so small reports return fast, then the
+        # interval doubles up to a second so slow reports don't get hammered
+        # with report_get calls.
         reports = []
-        for i in range(50):
-            time.sleep(0.1)
+        delay = 0.01
+        deadline = time.monotonic() + timeout
+        while True:
+            # +/-20% jitter so clients that submitted reports at the same
+            # moment don't re-poll the server in synchronized waves.
+            time.sleep(delay * (0.8 + 0.4*random.random()))
 
             report = self.zerp_.report_get(generated_report_id)
 
             if report['state']:
                 # Normalize the result (take the result string out of
                 # base64 encoding)
-                report['result'] = base64.decodestring(report['result'])
+                report['result'] = base64.b64decode(report['result'])
 
                 # Add it to the list of reports found.
                 reports.append(report)
                 break
 
-        # Couldn't get it!
-        else:
-            raise Exception("Couldn't get report!")
+            # Couldn't get it!
+            if time.monotonic() >= deadline:
+                raise Exception("Couldn't get report!")
+
+            delay = min(delay*2,1.0)
 
         return reports
 
+    def reports_fetch_many(self, ids_list, context=None, timeout=30 ):
+        """ Request several reports be generated at once then fetch them all!
+
+            Takes a list of `ids` lists, one per report. Every generation
+            request is submitted up front so the server can work on them
+            concurrently, then the outstanding ones are polled on a single
+            shared backoff schedule instead of serially waiting out each
+            report in turn. The reports come back in the same order as the
+            requests.
+        """
+        if context is None: context = {}
+
+        generated = [self.report(ids,context) for ids in ids_list]
+
+        results = {}
+        pending = set(range(len(generated)))
+        delay = 0.01
+        deadline = time.monotonic() + timeout
+        while pending:
+            # +/-20% jitter so clients that submitted reports at the same
+            # moment don't re-poll the server in synchronized waves.
+            time.sleep(delay * (0.8 + 0.4*random.random()))
+
+            for index in list(pending):
+                report = self.zerp_.report_get(generated[index])
+                if report['state']:
+                    report['result'] = base64.b64decode(report['result'])
+                    results[index] = report
+                    pending.discard(index)
+
+            # Couldn't get them all!
+            if pending and time.monotonic() >= deadline:
+                raise Exception("Couldn't get report!")
+
+            delay = min(delay*2,1.0)
+
+        return [results[index] for index in range(len(generated))]
+
     def report_fetch_one(self, report_id, context=None ):
         reports = self.reports_fetch([report_id],context)
         return reports[0]
 
+    async def reports_fetch_async(self, ids, context=None, timeout=30 ):
+        """ Asynchronous counterpart to reports_fetch!
+
+            Mirrors the synchronous polling logic but yields to the event
+            loop while waiting, so several reports can be pipelined from a
+            single thread:
+
+            >>> reports = await asyncio.gather(*[
+            ...     model.report_fetch_one_async(i) for i in report_ids
+            ... ])
+
+            The underlying swampyer connection is thread-based rather than
+            awaitable, so the WAMP calls themselves run in the loop's
+            default executor.
+        """
+        if context is None: context = {}
+
+        loop = asyncio.get_running_loop()
+        generated_report_id = await loop.run_in_executor(
+            None, self.report, ids, context)
+
+        reports = []
+        delay = 0.01
+        deadline = time.monotonic() + timeout
+        while True:
+            # +/-20% jitter so clients that submitted reports at the same
+            # moment don't re-poll the server in synchronized waves.
+            await asyncio.sleep(delay * (0.8 + 0.4*random.random()))
+
+            report = await loop.run_in_executor(
+                None, self.zerp_.report_get, generated_report_id)
+
+            if report['state']:
+                report['result'] = base64.b64decode(report['result'])
+                reports.append(report)
+                break
+
+            # Couldn't get it!
+            if time.monotonic() >= deadline:
+                raise Exception("Couldn't get report!")
+
+            delay = min(delay*2,1.0)
+
+        return reports
+
+    async def report_fetch_one_async(self, report_id, context=None, timeout=30 ):
+        reports = await self.reports_fetch_async([report_id],context,timeout)
+        return reports[0]
+
 
     def __getattr__(self,k):
-        if k in METHOD_SHORTHANDS:
-            return lambda *a,**kw: self.zerp_.call(
-                u':'.join([self.model_,METHOD_SHORTHANDS[k]]),
-                *a, **kw
-            )
+        # Pickling, deepcopy and logging frameworks probe for dunders like
+        # __reduce__ and __deepcopy__; wrapping those into RPC callables
+        # sends spurious WAMP traffic and breaks the protocols that expect
+        # a missing attribute. Let them see a normal AttributeError.
+        if (k.startswith('__') and k.endswith('__')) or k in PROBE_ATTRIBUTES:
+            raise AttributeError(k)
+        # Build the URI once and cache a bound callable on the instance so
+        # subsequent lookups of the same method hit the instance __dict__
+        # directly instead of allocating a fresh closure per access.
+        method = METHOD_SHORTHANDS.get(k)
+        if method is None:
+            method = 'object.execute.'+k
+        fn = functools.partial(self.zerp_.call_raw, self._uri_prefix_+method)
+        # Only cache stable public names on the instance; underscored or
+        # dunder lookups (introspection, pickling probes) shouldn't leave
+        # RPC callables behind in __dict__.
+        if not k.startswith('_'):
+            setattr(self, k, fn)
+        return fn
+
+_HOST_INFO = None
+
+
+def _get_host_info(zerp):
+    """ Resolve the local (hostname, ipaddress) pair for hello().
+        Both lookups are syscalls that can take milliseconds and neither
+        changes within a process lifetime, so the result is computed once
+        and cached at module level.
+    """
+    global _HOST_INFO
+    if _HOST_INFO is not None:
+        return _HOST_INFO
+
+    from socket import gethostname
+    try:
+        hostname = gethostname()
+    except Exception as err:
+        hostname = None
+        log.error("Unable to determine hostname {}".format(err))
+    try:
+
+        # This is a deprecated method of getting the connection IP from
+        # the wamp connection. With version 2.x, as the internal structure
+        # has moved from being websocket-only to an abstracted transport,
+        # connecting directly to a websocket instance is no longer feasible.
+        try:
+            ipaddress = zerp.wamp.wamp.ws.sock.getsockname()[0]
+        except AttributeError:
+            if netifaces is not None:
+                # Resolve the default-route interface's address without
+                # touching the network stack.
+                gateway, iface = netifaces.gateways()['default'][netifaces.AF_INET]
+                ipaddress = netifaces.ifaddresses(iface)[netifaces.AF_INET][0]['addr']
+            else:
+                # Pinched from:
+                # https://stackoverflow.com/questions/166506/finding-local-ip-addresses-using-pythons-stdlib/28950776#28950776
+                # FIXME: This will only support IPv4 addresses, at some point
+                # we'd want to allow IPv6 or even other types of network/mesh
+                # identities
+                import socket
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                try:
+                    sock.connect(('10.255.255.255', 1))
+                    ipaddress = sock.getsockname()[0]
+                finally:
+                    sock.close()
+    except Exception as err:
+        ipaddress = None
+        log.error("Unable to determine ipaddress {}".format(err))
+
+    _HOST_INFO = (hostname, ipaddress)
+    return _HOST_INFO
+
+
+class ZERPBatch(object):
+    """ Queues WAMP calls made while active and flushes them through a
+        thread pool, overlapping the network round-trips instead of paying
+        them serially. Calls made inside the batch return a
+        concurrent.futures.Future; results are available once the batch
+        flushes (on exit, or when MAX_BATCH_SIZE calls have queued).
+    """
 
+    MAX_BATCH_SIZE = 50
 
+    def __init__(self,zerp,max_workers=8):
+        self.zerp_ = zerp
+        self.max_workers = max_workers
+        self.queued = []
+
+    def queue(self,uri,args,kwargs):
+        future = Future()
+        self.queued.append((uri,args,kwargs,future))
+        if len(self.queued) >= self.MAX_BATCH_SIZE:
+            self.flush()
+        return future
+
+    def flush(self):
+        queued = self.queued
+        self.queued = []
+        if not queued:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for item in queued:
+                executor.submit(self._resolve,*item)
+
+    def _resolve(self,uri,args,kwargs,future):
+        try:
+            future.set_result(self.zerp_.wamp.call(uri,*args,**kwargs))
+        except Exception as err:
+            future.set_exception(err)
+
+    def __enter__(self):
+        self.zerp_._batch_local.batch = self
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.zerp_._batch_local.batch = None
+        if exc_type is None:
+            self.flush()
         else:
-            return lambda *a,**kw: self.zerp_.call(
-                u':'.join([self.model_,'object.execute.'+k]),
-                *a, **kw
-            )
+            # The calls will never be made; cancel their futures so any
+            # caller already holding one fails fast instead of blocking
+            # forever on .result()
+            queued = self.queued
+            self.queued = []
+            for uri,args,kwargs,future in queued:
+                future.cancel()
+
 
 class ZERP(object):
     def __init__(self,*args,**kwargs):
+        self.schema_ttl = kwargs.pop('schema_ttl',SCHEMA_TTL)
+        self.schema_cache_max = kwargs.pop('schema_cache_max',SCHEMA_CACHE_MAX)
+        self.schema_cache = OrderedDict()
+        self._schema_hits = 0
+        self._schema_misses = 0
+        self._schema_locks = {}
+        self._schema_locks_lock = threading.Lock()
+        self._batch_local = threading.local()
         self.configure(*args,**kwargs)
-        self.schema_cache = {}
 
     def hello(self, file_, **kwargs):
         """Introduce yourself to Zerp so a log entry can be made to aid
@@ -100,37 +353,8 @@ class ZERP(object):
 
         >>> zerp.hello(__file__, author="My Name", version="1.0", description="Just an example")
         """
-        from socket import gethostname
         from . import __version__
-        try:
-            hostname = gethostname()
-        except Exception as err:
-            hostname = None
-            log.error("Unable to determine hostname {}".format(err))
-        try:
-
-            # This is a deprecated method of getting the connection IP from
-            # the wamp connection. With version 2.x, as the internal structure
-            # has moved from being websocket-only to an abstracted transport,
-            # connecting directly to a websocket instance is no longer feasible.
-            try:
-                ipaddress = self.wamp.wamp.ws.sock.getsockname()[0]
-            except AttributeError:
-                # Pinched from:
-                # https://stackoverflow.com/questions/166506/finding-local-ip-addresses-using-pythons-stdlib/28950776#28950776
-                # FIXME: This will only support IPv4 addresses, at some point
-                # we'd want to allow IPv6 or even other types of network/mesh
-                # identities
-                import socket
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                try:
-                    sock.connect(('10.255.255.255', 1))
-                    ipaddress = sock.getsockname()[0]
-                finally:
-                    sock.close()
-        except Exception as err:
-            ipaddress = None
-            log.error("Unable to determine ipaddress {}".format(err))
+        hostname, ipaddress = _get_host_info(self)
         try:
             authid = self.wamp.wamp.authid
         except Exception as err:
@@ -150,22 +374,133 @@ class ZERP(object):
     def configure(self,
                     wamp=None,
                     database=None):
-        if not wamp is None:
+        if wamp is not None:
             self.wamp = wamp
-        if not database is None:
-            self.database = unicode(database)
+        if database is not None:
+            self.database = str(database)
+            # Precompute the URI prefix so call() does a single concat
+            # rather than a list allocation + join per RPC.
+            self._call_prefix = u'zerp:' + self.database + u':'
 
     def schema(self,model):
-        return self.call(model+':object.execute.fields_get')
+        # Straight to the wamp layer: going through call()/call_raw() inside
+        # a batch() block would queue the fetch and poison schema_cache with
+        # a Future that outlives the batch by a full TTL
+        return self.wamp.call(self._call_prefix+model+':object.execute.fields_get')
 
     def get_model(self,model):
-        return ZERPModel(self,model,self.schema(model))
+        # Schemas only change on server module upgrades, so reuse the one we
+        # already fetched rather than paying a fields_get round-trip for every
+        # wrapper built against the same model. Keyed by database as well so
+        # reconfiguring against another database doesn't serve stale schemas.
+        return ZERPModel(self,model,self._schema_cached(model))
+
+    def _schema_cached(self,model):
+        key = (self.database,model)
+        entry = self.schema_cache.get(key)
+        if entry is not None:
+            schema,fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age <= self.schema_ttl:
+                self._schema_hits += 1
+                self.schema_cache.move_to_end(key)
+                # Entries close to expiry are refreshed off the calling
+                # thread, so a steady stream of get_model calls never
+                # blocks on the refetch.
+                if age >= self.schema_ttl * (1.0 - SCHEMA_REFRESH_BAND):
+                    threading.Thread(
+                        target=self._refresh_schema,
+                        args=(key,model),
+                        daemon=True,
+                    ).start()
+                return schema
+        # Miss or expired: fetch under a per-model lock so concurrent
+        # callers collapse into a single RPC.
+        self._schema_misses += 1
+        with self._schema_lock(key):
+            entry = self.schema_cache.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.schema_ttl:
+                return entry[0]
+            schema = self.schema(model)
+            self._store_schema(key,schema)
+            return schema
+
+    def _schema_lock(self,key):
+        with self._schema_locks_lock:
+            lock = self._schema_locks.get(key)
+            if lock is None:
+                lock = self._schema_locks[key] = threading.Lock()
+            return lock
+
+    def _store_schema(self,key,schema):
+        cache = self.schema_cache
+        cache[key] = (schema,time.monotonic())
+        cache.move_to_end(key)
+        while len(cache) > self.schema_cache_max:
+            cache.popitem(last=False)
+
+    def _refresh_schema(self,key,model):
+        lock = self._schema_lock(key)
+        # Another refresh or fetch is already in flight; the cached entry
+        # is still valid so just let that one win.
+        if not lock.acquire(False):
+            return
+        try:
+            schema = self.schema(model)
+            self._store_schema(key,schema)
+        except Exception as err:
+            log.error("Unable to refresh schema for {}: {}".format(model,err))
+        finally:
+            lock.release()
+
+    def schema_cache_stats(self):
+        """ Return hit/miss/size counters for the schema cache, for
+            exporting to whatever metrics system the caller runs
+        """
+        return {
+            'hits': self._schema_hits,
+            'misses': self._schema_misses,
+            'size': len(self.schema_cache),
+            'max': self.schema_cache_max,
+        }
+
+    def invalidate_schema(self,model=None):
+        """ Drop the cached schema for one model, or all of them,
+            forcing a refetch on the next get_model
+        """
+        if model is None:
+            self.schema_cache.clear()
+        else:
+            self.schema_cache.pop((self.database,model),None)
 
     # Alias
     get = get_model
 
+    def batch(self,max_workers=8):
+        """ Return a context manager that queues calls made through this
+            handle and flushes them concurrently:
+
+            >>> with zerp.batch():
+            ...     futures = [users.read([i]) for i in ids]
+            >>> results = [f.result() for f in futures]
+
+            Inside the block each call returns a Future instead of its
+            result. get_model stays safe to call here - its schema fetch
+            bypasses the batch - but it blocks on a cache miss, so fetch
+            models up front when latency matters.
+        """
+        return ZERPBatch(self,max_workers)
+
     def call(self,uri,*args,**kwargs):
-        uri = u':'.join(['zerp',self.database,uri])
+        return self.call_raw(self._call_prefix+uri,*args,**kwargs)
+
+    def call_raw(self,uri,*args,**kwargs):
+        """ Invoke an RPC whose URI is already fully qualified, skipping
+            the zerp:<database>: prefixing that call() performs
+        """
+        batch = getattr(self._batch_local,'batch',None)
+        if batch is not None:
+            return batch.queue(uri,args,kwargs)
         return self.wamp.call(uri,*args,**kwargs)
 
     def report_get(self,report_id):
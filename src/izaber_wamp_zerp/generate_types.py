@@ -1,11 +1,18 @@
 import ast
 import base64
+import copy
+import functools
+import hashlib
+import io
 import json
 import keyword
 import lzma
 import os
+import shutil
+import sys
 import textwrap
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 from typing import (
@@ -14,7 +21,7 @@ from typing import (
     List,
     Literal,
     Optional,
-    Type,
+    Tuple,
     TypedDict,
     TypeVar,
     Union,
@@ -24,12 +31,21 @@ from typing import (
 from izaber import initialize
 from tqdm import tqdm
 
-from izaber_wamp_zerp import zerp
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from izaber_wamp_zerp import __version__, zerp
 
 initialize()
 
 
-MODEL_DIRECTORY = os.path.join(Path(__file__).parent, "models")
+MODEL_DIRECTORY = Path(__file__).parent / "models"
+
+
+# On-disk cache of generated sources, keyed by a hash of each model's metadata.
+CACHE_DIRECTORY = MODEL_DIRECTORY / ".cache"
 
 
 # Zerp to Python field types.
@@ -56,27 +72,40 @@ Z2P_TYPES = {
 }
 
 
+# Pre-parsed annotation nodes for each field type. Parsing at import time also
+# yields structurally correct nodes for compound types such as
+# "Union[str, Literal[False]]", which a bare ast.Name cannot represent.
+Z2P_NODES: Dict[str, ast.expr] = {
+    ztype: ast.parse(ptype, mode="eval").body for ztype, ptype in Z2P_TYPES.items()
+}
+
+
+# Python keywords cannot be used as generated attribute names.
+# Example: 'global' on ir_rule.
+_KEYWORDS = frozenset(keyword.kwlist)
+
+
 # Base ORM module.
 BASE_MODULE = "openerp.osv.orm"
 
 
-# Base ZERP functions.
-BASE_FUNCTIONS = [
+# Base ZERP functions. Only ever used for membership tests.
+BASE_FUNCTIONS = frozenset([
     "create",
     "read",
     "write",
     "unlink",
     "search",
     "search_fetch",
-]
+])
 
 
-# Argument filters.
-BASE_ARGS = [
+# Argument filters. Only ever used for membership tests.
+BASE_ARGS = frozenset([
     "cr",
     "uid",
     "user",
-]
+])
 
 
 DOMAIN_OPERATORS = [
@@ -105,9 +134,27 @@ DOMAIN_OPERATORS = [
 SET_OPERATIONS = ["&", "|", "!"]
 
 
+# Source fragments for the operator Literal annotations, joined once at
+# import time; the operator lists never change between models.
+_DOMAIN_OPERATORS_SRC = ", ".join(map(repr, DOMAIN_OPERATORS))
+_SET_OPERATIONS_SRC = ", ".join(map(repr, SET_OPERATIONS))
+
+
 BASE_MODEL_NAME = "BaseModel"
 
 
+# Templates parsed once at import time and copied/mutated by the node helpers
+# below, instead of hand-assembling the same nested ast.* nodes on every call.
+_LIST_ANNOTATION_TEMPLATE = ast.parse("List[X]", mode="eval").body
+_LITERAL_ANNOTATION_TEMPLATE = ast.parse("Literal[()]", mode="eval").body
+
+
+# Expression context markers are stateless, so every node can share the same
+# two instances instead of allocating one per node.
+_LOAD = ast.Load()
+_STORE = ast.Store()
+
+
 def module(body: List[ast.AST], type_ignores: List[ast.TypeIgnore]) -> ast.Module:
     """Create an ast.Module node.
 
@@ -128,16 +175,8 @@ def list_annotation(member_type: str) -> ast.Subscript:
     Args:
         member_type: The member type of the list.
     """
-    list_ident = "List"
-
-    name_node = name(value=list_ident, ctx=ast.Load())
-    type_node = name(value=member_type, ctx=ast.Load())
-
-    node = ast.Subscript(
-        value=name_node,
-        slice=type_node,
-        ctx=ast.Load(),
-    )
+    node = copy.deepcopy(_LIST_ANNOTATION_TEMPLATE)
+    node.slice.id = member_type
     return node
 
 
@@ -210,13 +249,26 @@ def create_import(names: List[str], from_module: str, *, level: int = 0) -> Unio
         Union[ast.ImportFrom, ast.Import]: An `ast.ImportFrom` node if `from_module` is specified,
                                            otherwise an `ast.Import` node.
     """
-    aliases = list(map(import_alias, names))
+    aliases = [import_alias(n) for n in names]
 
     if from_module:
         return import_from_statement(from_module, aliases, level=level)
     return import_statement(aliases)
 
 
+# The typing imports emitted at the top of every generated module, built once
+# and deepcopied per model instead of reconstructing the alias list each time.
+_TYPING_IMPORT_TABLE = create_import(
+    ["Any", "Dict", "List", "Literal", "Optional", "Tuple", "Union", "overload"],
+    "typing",
+)
+_TYPING_IMPORT_RECORD = create_import(
+    ["Any", "Dict", "List", "Literal", "Optional", "Tuple", "Union", "TypedDict"],
+    "typing",
+)
+_BASE_IMPORT = create_import([BASE_MODEL_NAME], "base", level=1)
+
+
 def argument(name: str, annotation: Union[ast.Name, ast.Subscript, ast.Expr, None]) -> ast.arg:
     """Create an ast.arg node.
 
@@ -227,8 +279,11 @@ def argument(name: str, annotation: Union[ast.Name, ast.Subscript, ast.Expr, Non
         name: The name of the argument.
         annotation: The annotation of the argument.
     """
+    # Argument names repeat endlessly across models (context, ids, vals, ...)
+    # but arrive as fresh strings from the JSON metadata; interning collapses
+    # the duplicates held alive by cached nodes.
     arg_node = ast.arg(
-        arg=name,
+        arg=sys.intern(name),
         annotation=annotation,
     )
     return arg_node
@@ -247,7 +302,7 @@ def function_call(
         keywords: A list of the keyword arguments.
     """
     if isinstance(function_name, str):
-        function_name = name(value=function_name, ctx=ast.Load())
+        function_name = name(value=function_name, ctx=_LOAD)
 
     node = ast.Call(
         func=function_name,
@@ -287,6 +342,12 @@ def arguments(args: List[ast.arg], defaults: List[ast.Constant]) -> ast.argument
     return args_node
 
 
+# Load-context Name nodes are never mutated after construction, so the same
+# node can appear in any number of trees; identical names are interned here
+# instead of reallocated per use.
+_NAME_CACHE: Dict[str, ast.Name] = {}
+
+
 def name(value: str, ctx: Optional[Union[ast.Load, ast.Store]] = None) -> ast.Name:
     """Create an ast.Name node.
 
@@ -297,14 +358,13 @@ def name(value: str, ctx: Optional[Union[ast.Load, ast.Store]] = None) -> ast.Na
         value: The name as a string.
         ctx: Either ast.Load or ast.Store.
     """
-    if not ctx:
-        ctx = ast.Load()
+    if not ctx or ctx is _LOAD:
+        node = _NAME_CACHE.get(value)
+        if node is None:
+            node = _NAME_CACHE[value] = ast.Name(id=value, ctx=_LOAD)
+        return node
 
-    node = ast.Name(
-        id=value,
-        ctx=ctx,
-    )
-    return node
+    return ast.Name(id=value, ctx=ctx)
 
 
 def function_definition(
@@ -347,7 +407,7 @@ def variable_assignment(var_name: str, value: Union[ast.Call, ast.Constant]) ->
         var_name: The name of the variable.
         value: The value of the variable.
     """
-    name_node = name(var_name, ast.Store())
+    name_node = name(var_name, _STORE)
     node = ast.Assign(
         targets=[name_node],
         value=value,
@@ -373,7 +433,9 @@ def class_definition(
         base_classes: The classes that this class inherits.
         body: The contents of the class.
     """
-    bases = map(name, base_classes)
+    # Materialize: a map iterator here would be exhausted by the first walk
+    # over the tree, silently dropping the bases on any later traversal.
+    bases = [name(base) for base in base_classes]
 
     node = ast.ClassDef(
         name=class_name,
@@ -385,7 +447,7 @@ def class_definition(
     return node
 
 
-def variable_annotation(variable_name: str, type_: str) -> ast.AnnAssign:
+def variable_annotation(variable_name: str, type_: Union[str, ast.expr]) -> ast.AnnAssign:
     """Create an ast.AnnAssign node.
 
     Example:
@@ -393,10 +455,15 @@ def variable_annotation(variable_name: str, type_: str) -> ast.AnnAssign:
 
     Args:
         variable_name: The name of the variable.
-        type_: The type of the annotation.
+        type_: The type of the annotation, as a string or a pre-parsed node.
     """
-    var_node = name(value=variable_name, ctx=ast.Load())
-    annotation_node = name(value=type_, ctx=ast.Load())
+    var_node = name(value=variable_name, ctx=_LOAD)
+    if isinstance(type_, str):
+        annotation_node = name(value=type_, ctx=_LOAD)
+    else:
+        # Annotation subtrees are never mutated once built, so pre-parsed
+        # nodes are shared by reference rather than copied per use.
+        annotation_node = type_
 
     node = ast.AnnAssign(
         target=var_node,
@@ -442,13 +509,8 @@ def literal_annotation(elements: List[ast.Constant]) -> ast.Subscript:
     Args:
         elements: The list of elements inside the Literal.
     """
-    node = ast.Subscript(
-        value=name(value="Literal", ctx=ast.Load()),
-        slice=ast.Tuple(
-            elts=elements,
-            ctx=ast.Load(),
-        ),
-    )
+    node = copy.deepcopy(_LITERAL_ANNOTATION_TEMPLATE)
+    node.slice.elts = elements
     return node
 
 
@@ -465,20 +527,37 @@ def fields_literal(
         variable_name: The name of the variable.
         arguments: A list of arguments to the Literal.
     """
-    target_node = name(value=make_fields_type_alias(variable_name), ctx=ast.Store())
+    target_node = name(value=make_fields_type_alias(variable_name), ctx=_STORE)
     element_nodes = [constant(a) for a in arguments]
     subscript_node = literal_annotation(element_nodes)
     node = ast.Assign(
         targets=[target_node],
         value=subscript_node,
-        ctx=ast.Load(),
+        ctx=_LOAD,
     )
     return node
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_annotation(source: str) -> ast.expr:
+    """Parse an annotation expression and memoize the resulting node.
+
+    A single C-level ast.parse replaces the dozens of hand-assembled ast.*
+    constructor calls the composed hint nodes below used to make, and the
+    memoization collapses the repeat parses for every model that shares the
+    same annotation text.
+
+    Args:
+        source: The annotation source, e.g. "List[fields_sale_order_record]".
+    """
+    return ast.parse(source, mode="eval").body
+
+
 class BaseArgumentNode(ABC):
     """Base class for function arguments that require composed AST argument annotation nodes."""
 
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def get(cls, model_name: str, method_name: str, argument_name: str) -> Any:
@@ -489,6 +568,8 @@ class BaseArgumentNode(ABC):
 class BaseReturnNode(ABC):
     """Base class for functions that require composed AST return annotation nodes."""
 
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def get(cls, model_name: str, method_name: str) -> Any:
@@ -496,6 +577,21 @@ class BaseReturnNode(ABC):
         ...
 
 
+@functools.lru_cache(maxsize=None)
+def _cached_argument_node(annotation_source: str, argument_name: str) -> ast.arg:
+    """Build, once per distinct annotation, the arg node for a composed annotation.
+
+    The model-specific annotations below repeat for every overload and every
+    run over the same model; the finished nodes are never mutated, so a single
+    shared node per (annotation, argument) pair serves every tree.
+
+    Args:
+        annotation_source: The annotation as source text.
+        argument_name: The arguments name.
+    """
+    return argument(argument_name, annotation=_parse_annotation(annotation_source))
+
+
 class ReadFieldsNode(BaseArgumentNode):
     """Constructs an argument annotation node representing the 'fields' argument on 'read()' for a given model.
 
@@ -504,12 +600,12 @@ class ReadFieldsNode(BaseArgumentNode):
     fields: List[fields_model_name_record]
     """
 
+    __slots__ = ()
+
     @classmethod
     def get(cls, model_name: str, method_name: str, argument_name: str) -> ast.arg:
         alias_name = make_fields_type_alias(make_read_model_classname(model_name))
-        fields_annotation = list_annotation(alias_name)
-        node = argument(argument_name, annotation=fields_annotation)
-        return node
+        return _cached_argument_node(f"List[{alias_name}]", argument_name)
 
 
 class ReadReturnsRecordNode(BaseReturnNode):
@@ -520,9 +616,11 @@ class ReadReturnsRecordNode(BaseReturnNode):
     -> model_name_record
     """
 
+    __slots__ = ()
+
     @classmethod
     def get(cls, model_name: str, method_name: str) -> ast.Name:
-        return name(make_read_model_classname(model_name), ctx=ast.Load())
+        return name(make_read_model_classname(model_name), ctx=_LOAD)
 
 
 class ReadReturnsRecordListNode(BaseReturnNode):
@@ -533,6 +631,8 @@ class ReadReturnsRecordListNode(BaseReturnNode):
     -> List[model_name_record]
     """
 
+    __slots__ = ()
+
     @classmethod
     def get(cls, model_name: str, method_name: str) -> ast.Subscript:
         return list_annotation(make_read_model_classname(model_name))
@@ -546,37 +646,16 @@ class SearchArgsNode(BaseArgumentNode):
     args: List[Union[SET_OPERATIONS, Tuple[fields_model_name_record, DOMAIN_OPERATORS, str]]]
     """
 
+    __slots__ = ()
+
     @classmethod
     def get(cls, model_name: str, method_name: str, argument_name: str) -> ast.arg:
         fields_literal_name = make_fields_type_alias(make_read_model_classname(model_name))
-        domain_operators_literal = literal_annotation([constant(a) for a in DOMAIN_OPERATORS])
-        set_operations_literal = literal_annotation([constant(a) for a in SET_OPERATIONS])
-        domain_tuple = ast.Subscript(
-            value=name(value="Tuple"),
-            slice=ast.Tuple(
-                elts=[
-                    name(value=fields_literal_name),
-                    domain_operators_literal,
-                    name(value="Any"),
-                ],
-                ctx=ast.Load(),
-            ),
-        )
-        union = ast.Subscript(
-            value=name("Union"),
-            slice=ast.Tuple(elts=[set_operations_literal, domain_tuple]),
-            ctx=ast.Load(),
+        return _cached_argument_node(
+            f"List[Union[Literal[{_SET_OPERATIONS_SRC}], "
+            f"Tuple[{fields_literal_name}, Literal[{_DOMAIN_OPERATORS_SRC}], Any]]]",
+            argument_name,
         )
-        list_ = ast.Subscript(
-            name(value="List"),
-            slice=union,
-            ctx=ast.Load(),
-        )
-        expression = ast.Expr(
-            value=list_,
-        )
-        node = argument(argument_name, annotation=expression)
-        return node
 
 
 class WriteValsNode(BaseArgumentNode):
@@ -587,25 +666,12 @@ class WriteValsNode(BaseArgumentNode):
     vals: Dict[fields_model_name_record, Any]
     """
 
+    __slots__ = ()
+
     @classmethod
     def get(cls, model_name: str, method_name: str, argument_name: str) -> ast.arg:
         fields_literal_name = make_fields_type_alias(make_read_model_classname(model_name))
-
-        dict_tuple = ast.Subscript(
-            value=name(value="Dict"),
-            slice=ast.Tuple(
-                elts=[
-                    name(value=fields_literal_name),
-                    name(value="Any"),
-                ],
-                ctx=ast.Load(),
-            ),
-        )
-        expression = ast.Expr(
-            value=dict_tuple,
-        )
-        node = argument(argument_name, annotation=expression)
-        return node
+        return _cached_argument_node(f"Dict[{fields_literal_name}, Any]", argument_name)
 
 
 BASE_TYPE_HINTS: Dict[str, Union[List[Dict[str, Any]], Dict[str, Any]]] = {
@@ -672,6 +738,31 @@ BASE_TYPE_HINTS: Dict[str, Union[List[Dict[str, Any]], Dict[str, Any]]] = {
 }
 
 
+def _collect_base_hint_nodes() -> Dict[str, ast.expr]:
+    """Pre-parse every string annotation in BASE_TYPE_HINTS into an AST node.
+
+    Parsing happens once at import time so the per-model hot path never has to
+    invoke ast.parse for the fixed base-method hints.
+    """
+    nodes: Dict[str, ast.expr] = {}
+    for spec in BASE_TYPE_HINTS.values():
+        entries = spec if isinstance(spec, list) else [spec]
+        for entry in entries:
+            values = list(entry["arguments"].values())
+            values.append(entry.get("returns"))
+            for value in values:
+                if isinstance(value, str) and value not in nodes:
+                    nodes[value] = ast.parse(value, mode="eval").body
+    return nodes
+
+
+_BASE_HINT_NODES = _collect_base_hint_nodes()
+
+
+# The defaults that dominate real metadata, resolved without a parse.
+_COMMON_DEFAULTS = {"None": None, "True": True, "False": False}
+
+
 def infer_default(arg: Dict[str, Any]) -> Any:
     """Infer the Python type of a string representation of a Python object.
 
@@ -680,11 +771,23 @@ def infer_default(arg: Dict[str, Any]) -> Any:
     """
     if not arg["has_default"]:
         return None
+    default = arg["default"]
+    # Values that round-tripped through JSON are already Python-native; only
+    # string representations need the (comparatively expensive) parse.
+    if not isinstance(default, str):
+        return default
+    if default in _COMMON_DEFAULTS:
+        return _COMMON_DEFAULTS[default]
+    # Fast-path plain integer literals. Restricted to ASCII decimals with no
+    # leading zero, because isdigit() alone admits strings int() rejects
+    # (superscripts like "2\u00b2") and would coerce "007", which the
+    # literal_eval path below leaves as a string.
+    if default.isascii() and default.isdecimal() and (default == "0" or default[0] != "0"):
+        return int(default)
     try:
-        obj = ast.literal_eval(arg["default"])
-        return obj
-    except SyntaxError:
-        return arg["default"]
+        return ast.literal_eval(default)
+    except (SyntaxError, ValueError):
+        return default
 
 
 def construct_ast_node_from_string(
@@ -695,11 +798,40 @@ def construct_ast_node_from_string(
     Args:
         value: The string representation of a type.
     """
-    tree = ast.parse(value)
-    expr = cast(ast.Expr, tree.body[0])
-    return expr.value
+    node = _BASE_HINT_NODES.get(value)
+    if node is None:
+        node = ast.parse(value, mode="eval").body
+    # Shallow copy: nothing downstream mutates annotation subtrees, so the
+    # children can be shared; only the top node needs to be distinct.
+    return copy.copy(node)
+
+
+def _flatten_type_hint_tables() -> Tuple[Dict[Any, Any], Dict[Any, Any]]:
+    """Flatten BASE_TYPE_HINTS into direct dispatch tables.
+
+    The nested shape (methods mapping to either a spec dict or a list of
+    overload specs) forced every lookup through layered subscripts guarded by
+    try/except. Flattening to (method, overload_position, argument) and
+    (method, overload_position) keys turns each lookup into a single dict.get,
+    and makes asking for an overloaded method without a position a plain miss
+    instead of a TypeError from indexing a list with a string.
+    """
+    argument_table: Dict[Any, Any] = {}
+    return_table: Dict[Any, Any] = {}
+    for method, spec in BASE_TYPE_HINTS.items():
+        overloads = spec if isinstance(spec, list) else [spec]
+        for position, overload in enumerate(overloads):
+            key = position if isinstance(spec, list) else None
+            for argument_name, value in overload["arguments"].items():
+                argument_table[(method, key, argument_name)] = value
+            return_table[(method, key)] = overload["returns"]
+    return argument_table, return_table
+
+
+_ARG_TABLE, _RET_TABLE = _flatten_type_hint_tables()
 
 
+@functools.lru_cache(maxsize=None)
 def get_base_type_hint_node(value: str, argument_name: str) -> ast.arg:
     """Generate an AST type-hint node for a base method argument defined in BASE_TYPE_HINTS.
 
@@ -707,10 +839,8 @@ def get_base_type_hint_node(value: str, argument_name: str) -> ast.arg:
         value: The type hint.
         argument_name: The arguments name.
     """
-    tree = ast.parse(value)
-    expr = cast(ast.Expr, tree.body[0])
-    node = cast(ast.Subscript, expr.value)
-    arg_node = argument(argument_name, node)
+    node = construct_ast_node_from_string(value)
+    arg_node = argument(argument_name, cast(ast.Subscript, node))
     return arg_node
 
 
@@ -728,26 +858,17 @@ def get_argument_annotation_node(
         arg_name: The name of the argument.
         overload_position: The overload position index.
     """
-    if overload_position is not None:
-        try:
-            val = BASE_TYPE_HINTS[method_name][overload_position]["arguments"][arg_name]
-        except KeyError:
-            val = None
-    else:
-        try:
-            val = BASE_TYPE_HINTS[method_name]["arguments"][arg_name]
-        except KeyError:
-            val = None
-
     if model_name == BASE_MODEL_NAME:
         val = None
+    else:
+        val = _ARG_TABLE.get((method_name, overload_position, arg_name))
 
     if isinstance(val, type) and issubclass(val, BaseArgumentNode) and arg_name:
         node = val.get(model_name, method_name, arg_name)
     elif isinstance(val, str) and arg_name:
         node = get_base_type_hint_node(val, arg_name)
     elif arg_name:
-        node = argument(arg_name, annotation=name("Any", ctx=ast.Load()))
+        node = argument(arg_name, annotation=name("Any", ctx=_LOAD))
     else:
         raise TypeError(f"invalid annotation specified for {model_name}.{method_name}")
 
@@ -767,18 +888,11 @@ def get_return_annotation_node(
         overload_position: The overload position index.
     """
     if model_name == BASE_MODEL_NAME:
-        return name("Any", ctx=ast.Load())
-
-    if overload_position is not None:
-        val = BASE_TYPE_HINTS[method_name][overload_position]["returns"]
-    else:
-        try:
-            val = BASE_TYPE_HINTS[method_name]["returns"]
-        except KeyError:
-            return name("Any", ctx=ast.Load())
+        return name("Any", ctx=_LOAD)
 
+    val = _RET_TABLE.get((method_name, overload_position))
     if not val:
-        return name("Any", ctx=ast.Load())
+        return name("Any", ctx=_LOAD)
 
     if isinstance(val, type) and issubclass(val, BaseReturnNode):
         node = val.get(model_name, method_name)
@@ -790,6 +904,25 @@ def get_return_annotation_node(
     return node
 
 
+def _warm_type_hint_caches() -> None:
+    """Parse every string hint in BASE_TYPE_HINTS once, at import.
+
+    The lru caches behind the lookups make repeat parses free, but without
+    warming, each worker process still pays the first parse of each hint in
+    the middle of generating its first model. The table is small, so folding
+    that into import keeps the per-model path allocation-only.
+    """
+    for (_, _, argument_name), value in _ARG_TABLE.items():
+        if isinstance(value, str):
+            get_base_type_hint_node(value, argument_name)
+    for value in _RET_TABLE.values():
+        if isinstance(value, str):
+            construct_ast_node_from_string(value)
+
+
+_warm_type_hint_caches()
+
+
 class Field(TypedDict):
     type: str
     string: str
@@ -823,21 +956,16 @@ class ModelMetadataToASTHandler:
             overload_position: The overload position index.
         """
 
-        def parse_default(arg) -> ast.Constant:
-            default = infer_default(arg)
-            return constant(default)
-
-        default_nodes = []
-        arg_nodes = []
+        base_args = BASE_ARGS
+        args = [arg for arg in method_metadata["args"] if arg["name"] not in base_args]
 
-        for arg in method_metadata["args"]:
-            arg_name = arg["name"]
-            if arg_name in BASE_ARGS:
-                continue
-            if arg["has_default"]:
-                default_nodes.append(parse_default(arg))
-            node = get_argument_annotation_node(model_name, method_name, arg_name, overload_position)
-            arg_nodes.append(node)
+        arg_nodes = [
+            get_argument_annotation_node(model_name, method_name, arg["name"], overload_position)
+            for arg in args
+        ]
+        default_nodes = [
+            ast.Constant(value=infer_default(arg)) for arg in args if arg["has_default"]
+        ]
 
         return arguments(arg_nodes, default_nodes)
 
@@ -891,18 +1019,21 @@ class ModelMetadataToASTHandler:
         Args:
             field_metadata: The field metadata for the given model.
         """
-        annotation_nodes = []
-
-        for name, data in field_metadata.items():
-            # Skip field names that are python keywords.
-            # Example: 'global' on ir_rule.
-            if keyword.iskeyword(name):
-                continue
-            python_type = Z2P_TYPES[data["type"]]
-            node = variable_annotation(name, python_type)
-            annotation_nodes.append(node)
-
-        return annotation_nodes
+        # Bind the lookups once and build the nodes inline; this runs for
+        # every field of every model, so the helper-call frames add up.
+        # Field names that are python keywords are skipped.
+        keywords = _KEYWORDS
+        z2p_nodes = Z2P_NODES
+        intern = sys.intern
+        return [
+            ast.AnnAssign(
+                target=ast.Name(id=intern(name), ctx=_LOAD),
+                annotation=z2p_nodes[data["type"]],
+                simple=1,
+            )
+            for name, data in field_metadata.items()
+            if name not in keywords
+        ]
 
     @classmethod
     def overload(
@@ -922,7 +1053,7 @@ class ModelMetadataToASTHandler:
             overloaded = BASE_TYPE_HINTS[method_name][overload_position]["overload"]
         except (KeyError, TypeError):
             return None
-        return [name(value="overload", ctx=ast.Load())] if overloaded else None
+        return [name(value="overload", ctx=_LOAD)] if overloaded else None
 
     @classmethod
     def build_function(
@@ -959,6 +1090,7 @@ class ModelMetadataToASTHandler:
         return definitions
 
 
+@functools.lru_cache(maxsize=None)
 def make_model_classname(identifier: str) -> str:
     """Convert a dotted model identifier into a snake_case classname.
 
@@ -971,6 +1103,7 @@ def make_model_classname(identifier: str) -> str:
     return identifier.replace(".", "_")
 
 
+@functools.lru_cache(maxsize=None)
 def make_read_model_classname(identifier: str) -> str:
     """Convert a dotted model identifier into a snake_case classname with a '_record' suffix.
 
@@ -984,6 +1117,7 @@ def make_read_model_classname(identifier: str) -> str:
     return f"{new}_record"
 
 
+@functools.lru_cache(maxsize=None)
 def make_fields_type_alias(record_name: str) -> str:
     """Construct the name of the type alias used to enumerate the fields available on each model.
 
@@ -998,33 +1132,200 @@ def make_fields_type_alias(record_name: str) -> str:
 
 
 def get_all_model_metadata() -> List[Dict[str, Any]]:
-    """Retrieve the metadata for each model in the database."""
+    """Retrieve the metadata for each model in the database.
+
+    The decompressed metadata is cached on disk keyed by a hash of the
+    compressed payload, so repeat runs against unchanged upstream data skip the
+    base64 decode, LZMA decompression and cache write entirely.
+    """
     obj = zerp.get("ir.model")
     compressed_data = obj.get_all_models_metadata_cached_json_compressed_b64()
+    digest = hashlib.sha256(compressed_data.encode()).hexdigest()
+    CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    loads = orjson.loads if orjson is not None else json.loads
+    cache = CACHE_DIRECTORY / f"metadata_{digest}.json"
+    if cache.exists():
+        return loads(cache.read_bytes())
+    # A new payload supersedes any previously cached one; drop the old dumps
+    # so the cache holds a single copy of the metadata at a time.
+    for stale in CACHE_DIRECTORY.glob("metadata_*.json"):
+        stale.unlink()
     decoded = base64.b64decode(compressed_data)
-    decompressed = lzma.decompress(decoded)
-    return json.loads(decompressed)
+    # Stream the decompression straight into the cache file in chunks so the
+    # decoded blob and the full decompressed payload are never held in memory
+    # at the same time.
+    with lzma.LZMAFile(io.BytesIO(decoded)) as stream, open(cache, "wb") as out:
+        shutil.copyfileobj(stream, out)
+    del decoded
+    return loads(cache.read_bytes())
+
+
+# Statement nodes whose optional type comment makes ast.unparse read
+# node.lineno and node.type_comment.
+_TYPE_COMMENT_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Assign)
+
 
+def set_required_locations(module_node: ast.Module) -> ast.Module:
+    """Set the location attributes that ast.unparse actually reads.
 
-def write_model(tree: Union[ast.Module, ast.ClassDef], path: str) -> None:
-    """Write the source code represented by an AST node to a file.
+    ast.unparse ignores node locations except on statements that may carry a
+    type comment, where it looks up node.lineno against the module's type
+    ignores. Mark just those statements instead of paying for the full
+    recursive walk that ast.fix_missing_locations performs. The generated
+    modules only nest such statements at most one class deep.
 
     Args:
-        tree: The AST node representing the source code.
+        module_node: The module whose statements should be marked.
+    """
+
+    def mark(node: ast.stmt) -> None:
+        if isinstance(node, _TYPE_COMMENT_NODES):
+            node.lineno = 1
+            node.type_comment = None
+
+    for statement in module_node.body:
+        mark(statement)
+        if isinstance(statement, ast.ClassDef):
+            for inner in statement.body:
+                mark(inner)
+    return module_node
+
+
+def write_source(source: str, path: Path) -> None:
+    """Write generated source code to a file.
+
+    The write is skipped when the generated source is byte-identical to the
+    file already on disk, so unchanged models keep their mtime and downstream
+    tooling (mypy, IDE indexers, bytecode caches) is not invalidated.
+
+    Args:
+        source: The source code to write.
         path: The file path where the source code will be written.
     """
-    source = ast.unparse(tree)
-    with open(path, "wb") as f:
-        f.write(source.encode())
+    data = source.encode()
+    target = path
+    try:
+        # Cheap size check first; only read the old file when it could match.
+        if target.stat().st_size == len(data) and target.read_bytes() == data:
+            return
+    except FileNotFoundError:
+        pass
+    # Write to a sibling temp file and rename into place: the rename is
+    # atomic, so readers never see a truncated module, and it breaks any
+    # hardlink into the source cache so the cached copy keeps its content.
+    temporary = target.with_name(target.name + ".tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, target)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Materialize dst as a hardlink of src, copying when linking fails.
+
+    Hardlinking makes cache hits metadata-only operations; filesystems that
+    refuse cross-device or unsupported links fall back to a plain copy.
+
+    Args:
+        src: The existing file.
+        dst: The destination path; replaced if present.
+    """
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+# Top-level statements ast.unparse precedes with a blank line.
+_BLOCK_STATEMENTS = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _unparse_statement(statement: ast.stmt) -> str:
+    """Render a single top-level statement, fast-pathing import nodes.
+
+    Import statements are the one hot pattern every generated module shares;
+    their rendering is trivial string assembly, so skip the full NodeVisitor
+    dispatch of ast.unparse for them. Everything else falls through to
+    ast.unparse. Output is byte-identical either way.
+
+    Args:
+        statement: The statement to render.
+    """
+    if isinstance(statement, ast.ImportFrom):
+        names = ", ".join(
+            alias.name if alias.asname is None else f"{alias.name} as {alias.asname}"
+            for alias in statement.names
+        )
+        return f"from {'.' * statement.level}{statement.module or ''} import {names}"
+    if isinstance(statement, ast.Import):
+        names = ", ".join(
+            alias.name if alias.asname is None else f"{alias.name} as {alias.asname}"
+            for alias in statement.names
+        )
+        return f"import {names}"
+    return ast.unparse(statement)
+
+
+def unparse_module(tree: ast.Module) -> str:
+    """Render a module to source one top-level statement at a time.
+
+    Keeps the unparser's working set bounded by the largest statement instead
+    of the whole module. The joined result is byte-identical to running
+    ast.unparse over the module, including the blank lines inserted before
+    class and function definitions.
+
+    Args:
+        tree: The module to render.
+    """
+    segments = []
+    for index, statement in enumerate(tree.body):
+        if index:
+            segments.append("\n\n" if isinstance(statement, _BLOCK_STATEMENTS) else "\n")
+        segments.append(_unparse_statement(statement))
+    return "".join(segments)
+
+
+def metadata_digest(model_metadata: Dict[str, Any]) -> str:
+    """Digest a model's metadata together with the package version.
+
+    Metadata changes and library upgrades both produce a new digest, so
+    anything keyed on it is invalidated by either.
+
+    Args:
+        model_metadata: The metadata of a single model.
+    """
+    return hashlib.blake2b(
+        (json.dumps(model_metadata, sort_keys=True, default=str) + __version__).encode(),
+        digest_size=16,
+    ).hexdigest()
 
 
 class Model(ABC):
     """Abstract base class for models that generate abstract syntax trees."""
 
-    def __init__(self, model_name: str, model_metadata: Dict[str, Any]) -> None:
-        """Initialize the model."""
+    # Thousands of instances are created per run; slots keep them to a fixed
+    # layout instead of a per-instance dict.
+    __slots__ = ("model_name", "model_metadata", "digest", "class_name", "record_name", "name")
+
+    def __init__(
+        self,
+        model_name: str,
+        model_metadata: Dict[str, Any],
+        digest: Union[str, None] = None,
+    ) -> None:
+        """Initialize the model.
+
+        Args:
+            model_name: The name of the model.
+            model_metadata: The metadata of the model.
+            digest: A precomputed `metadata_digest` of `model_metadata`, when
+                the caller builds several models from the same metadata.
+        """
         self.model_name = model_name
         self.model_metadata = model_metadata
+        self.digest = digest
         self.class_name = make_model_classname(self.model_name)
         self.record_name = make_read_model_classname(self.model_name)
         self.name = None
@@ -1035,20 +1336,56 @@ class Model(ABC):
         ...
 
     @abstractmethod
-    def write(self, tree: ast.Module) -> None:
-        """Write the AST to a file."""
+    def path(self) -> Path:
+        """Return the path the generated source is written to."""
         ...
 
+    def generate_source(self) -> Union[str, None]:
+        """Render the model straight to source text.
+
+        Subclasses with highly regular output override this to skip AST
+        construction and ast.unparse entirely. The default of None means the
+        AST pipeline is used.
+        """
+        return None
+
+    def cache_key(self) -> str:
+        """Compute the cache key for the model's generated source.
+
+        The key incorporates the model's name, its metadata and the package
+        version: metadata changes and library upgrades both invalidate the
+        cached source, and two models whose metadata serialize identically
+        (e.g. field-less transient models sharing a method set) never share
+        an entry, since the generated source embeds the model's own name.
+        """
+        digest = self.digest or metadata_digest(self.model_metadata)
+        return f"{self.class_name}_{digest}_{type(self).__name__}"
+
     def create(self) -> None:
-        """Generate and write the model's AST to a file."""
-        tree = self.generate_ast()
-        if tree:
-            self.write(tree)
+        """Generate and write the model's AST to a file.
+
+        Generation is skipped entirely when a cached source generated from
+        identical metadata exists from a previous run.
+        """
+        cache_path = CACHE_DIRECTORY / (self.cache_key() + ".src")
+        if cache_path.exists():
+            _link_or_copy(cache_path, self.path())
+            return
+        source = self.generate_source()
+        if source is None:
+            tree = self.generate_ast()
+            if not tree:
+                return
+            source = unparse_module(tree)
+        write_source(source, self.path())
+        _link_or_copy(self.path(), cache_path)
 
 
 class TableModel(Model):
     """Represents the method signatures available on a particular model."""
 
+    __slots__ = ()
+
     def generate_ast(self) -> Union[ast.Module, None]:
         """Generate an AST module tree representing the method signatures of the model.
 
@@ -1062,21 +1399,10 @@ class TableModel(Model):
 
         field_name = make_fields_type_alias(self.record_name)
         import_node = create_import([self.record_name, field_name], self.record_name, level=1)
-        base_import_node = create_import([BASE_MODEL_NAME], "base", level=1)
-        typing_import_node = create_import(
-            [
-                "Any",
-                "Dict",
-                "List",
-                "Literal",
-                "Optional",
-                "Tuple",
-                "Union",
-                "overload",
-            ],
-            "typing",
-            level=0,
-        )
+        # Shallow copies: the alias lists are shared, only the statement node
+        # itself is distinct per module.
+        base_import_node = copy.copy(_BASE_IMPORT)
+        typing_import_node = copy.copy(_TYPING_IMPORT_TABLE)
 
         methods = self.model_metadata["methods"]
         for method, method_metadata in methods.items():
@@ -1089,17 +1415,17 @@ class TableModel(Model):
 
         class_node = class_definition(self.class_name, [BASE_MODEL_NAME], body_nodes)
         module_node = module([typing_import_node, import_node, base_import_node, class_node], [])
-        new_tree = ast.fix_missing_locations(module_node)
-        return new_tree
+        return set_required_locations(module_node)
 
-    def write(self, tree: ast.Module) -> None:
-        path = os.path.join(MODEL_DIRECTORY, self.class_name + ".py")
-        return write_model(tree, path)
+    def path(self) -> Path:
+        return MODEL_DIRECTORY / (self.class_name + ".py")
 
 
 class RecordModel(Model):
     """A TypedDict representing the columns, and their types, available on each model."""
 
+    __slots__ = ()
+
     def generate_ast(self) -> Union[ast.Module, None]:
         """Generate the AST describing a models columns.
 
@@ -1112,20 +1438,7 @@ class RecordModel(Model):
         annotation_nodes: List[Union[ast.AnnAssign, ast.Expr, ast.Assign, ast.FunctionDef]] = []
 
         fields = self.model_metadata["fields"]
-        typing_import_node = create_import(
-            [
-                "Any",
-                "Dict",
-                "List",
-                "Literal",
-                "Optional",
-                "Tuple",
-                "Union",
-                "TypedDict",
-            ],
-            "typing",
-            level=0,
-        )
+        typing_import_node = copy.copy(_TYPING_IMPORT_RECORD)
         keys = fields.keys() if fields else [None]
         fields_definition = fields_literal(self.record_name, keys)
         if fields:
@@ -1134,17 +1447,50 @@ class RecordModel(Model):
             annotation_nodes.append(ellipsis_expression())
         class_node = class_definition(self.record_name, ["TypedDict"], annotation_nodes)
         module_node = module([typing_import_node, fields_definition, class_node], [])
-        new_tree = ast.fix_missing_locations(module_node)
-        return new_tree
+        return set_required_locations(module_node)
 
-    def write(self, tree: ast.Module) -> None:
-        path = os.path.join(MODEL_DIRECTORY, self.record_name + ".py")
-        return write_model(tree, path)
+    def generate_source(self) -> str:
+        """Render the record module directly to source text.
+
+        Record modules are just an import, a Literal alias and a TypedDict of
+        annotated fields, so they are written with simple string formatting
+        rather than paying for AST construction and ast.unparse. The output is
+        identical to what `generate_ast` would produce; the AST path remains as
+        a fallback should the shape of record modules ever grow beyond this.
+        """
+        fields = self.model_metadata["fields"]
+        keys = fields.keys() if fields else [None]
+        # ast.unparse renders the Literal subscript as a tuple, which carries a
+        # trailing comma in the single-element case; mirror that exactly so the
+        # two code paths emit byte-identical files.
+        elements = ", ".join(map(repr, keys)) + ("," if len(keys) == 1 else "")
+        lines = [
+            "from typing import Any, Dict, List, Literal, Optional, Tuple, Union, TypedDict",
+            f"fields_{self.record_name} = Literal[{elements}]",
+            "",
+            f"class {self.record_name}(TypedDict):",
+        ]
+        if fields:
+            keywords = _KEYWORDS
+            z2p_types = Z2P_TYPES
+            lines.extend(
+                f"    {field_name}: {z2p_types[field_metadata['type']]}"
+                for field_name, field_metadata in fields.items()
+                if field_name not in keywords
+            )
+        else:
+            lines.append("    ...")
+        return "\n".join(lines)
+
+    def path(self) -> Path:
+        return MODEL_DIRECTORY / (self.record_name + ".py")
 
 
 class BaseModel(Model):
     """Represents the base ORM methods available to each model."""
 
+    __slots__ = ()
+
     def generate_ast(self) -> Union[ast.Module, None]:
         """Generate an AST describing the base methods available on the ORM.
 
@@ -1165,17 +1511,17 @@ class BaseModel(Model):
 
         class_node = class_definition(self.model_name, [], function_nodes)
         module_node = module([typing_import_node, class_node], [])
-        new_tree = ast.fix_missing_locations(module_node)
-        return new_tree
+        return set_required_locations(module_node)
 
-    def write(self, tree: ast.Module) -> None:
-        path = os.path.join(MODEL_DIRECTORY, "base.py")
-        return write_model(tree, path)
+    def path(self) -> Path:
+        return MODEL_DIRECTORY / "base.py"
 
 
 class TypedZERPModel(Model):
     """Represents a TypedDict for providing type hints to the `zerp` singleton."""
 
+    __slots__ = ()
+
     def generate_ast(self) -> Union[ast.Module, None]:
         """Generate the AST for the TypedZERP class providing type hints to the `zerp` singleton.
 
@@ -1183,28 +1529,49 @@ class TypedZERPModel(Model):
             ast.Module: An AST module node representing the TypedZERP class.
         """
         table_to_model_names = {
-            t: make_model_classname(t) for t in self.model_metadata if self.model_metadata[t]
+            t: make_model_classname(t) for t, metadata in self.model_metadata.items() if metadata
         }
         # Setup the imports.
-        import_nodes = []
-        import_nodes.append(create_import(["TypedDict"], "typing", level=0))
-        for model_name in table_to_model_names.values():
-            import_nodes.append(create_import([model_name], model_name, level=1))
+        import_nodes = [create_import(["TypedDict"], "typing", level=0)]
+        import_nodes.extend(
+            create_import([model_name], model_name, level=1)
+            for model_name in table_to_model_names.values()
+        )
 
         var_node = constant("TypedZERP")
         dict_node = dictionary(
-            keys=list(map(constant, table_to_model_names.keys())),
-            values=list(map(name, table_to_model_names.values())),
+            keys=[constant(table) for table in table_to_model_names],
+            values=[name(model_name) for model_name in table_to_model_names.values()],
         )
         function_call_node = function_call("TypedDict", [var_node, dict_node], [])
         variable_node = variable_assignment("TypedZERP", value=function_call_node)
         module_node = module(body=[*import_nodes, variable_node], type_ignores=[])
-        tree = ast.fix_missing_locations(module_node)
-        return tree
+        return set_required_locations(module_node)
+
+    def generate_source(self) -> str:
+        """Render the zerp module directly to source text.
+
+        Like record modules, this file is entirely regular: a typing import,
+        one import per model and a single TypedDict call. String formatting
+        produces the same bytes as the AST path without building and
+        unparsing a node per model.
+        """
+        table_to_model_names = {
+            t: make_model_classname(t) for t, metadata in self.model_metadata.items() if metadata
+        }
+        lines = ["from typing import TypedDict"]
+        lines.extend(
+            f"from .{model_name} import {model_name}"
+            for model_name in table_to_model_names.values()
+        )
+        entries = ", ".join(
+            f"{table!r}: {model_name}" for table, model_name in table_to_model_names.items()
+        )
+        lines.append(f"TypedZERP = TypedDict('TypedZERP', {{{entries}}})")
+        return "\n".join(lines)
 
-    def write(self, tree):
-        model_type_hint_path = os.path.join(MODEL_DIRECTORY, "zerp.py")
-        return write_model(tree, model_type_hint_path)
+    def path(self) -> Path:
+        return MODEL_DIRECTORY / "zerp.py"
 
 
 @dataclass
@@ -1221,6 +1588,8 @@ TDisplayHandler = TypeVar("TDisplayHandler", bound="DisplayHandler")
 class DisplayHandler:
     """Handler for displaying the progress of the model generation process."""
 
+    __slots__ = ("progress", "successes", "progress_bar")
+
     def __init__(self, total: int):
         self.progress = ModelProgress(total=total)
         self.successes: List[str] = []
@@ -1271,37 +1640,148 @@ class DisplayHandler:
         print(summary)
 
 
+# Files in the models package that are not per-model outputs and must
+# survive pruning.
+_PERMANENT_MODEL_FILES = frozenset(["__init__.py", "base.py", "zerp.py"])
+
+
+def prune_stale_models(expected_filenames: "set[str]") -> None:
+    """Delete generated files for models that no longer exist upstream.
+
+    Args:
+        expected_filenames: The file names the current run generates.
+    """
+    with os.scandir(MODEL_DIRECTORY) as entries:
+        for entry in entries:
+            filename = entry.name
+            if not filename.endswith(".py"):
+                continue
+            if filename in _PERMANENT_MODEL_FILES or filename in expected_filenames:
+                continue
+            os.unlink(entry.path)
+
+
+def prune_stale_cache(expected_filenames: "set[str]") -> None:
+    """Delete cached sources superseded by newer metadata digests.
+
+    Without this the source cache accretes one entry per digest forever, and
+    the whole directory lives inside the shipped package tree.
+
+    Args:
+        expected_filenames: The cache file names the current run used.
+    """
+    with os.scandir(CACHE_DIRECTORY) as entries:
+        for entry in entries:
+            if entry.name.endswith(".src") and entry.name not in expected_filenames:
+                os.unlink(entry.path)
+
+
+def process_model(item: Tuple[str, Dict[str, Any]]) -> str:
+    """Generate the record and table files for a single model.
+
+    Top-level so that it can be pickled into worker processes.
+
+    Args:
+        item: A (model_name, model_metadata) pair.
+
+    Returns:
+        str: The metadata digest the model's cache entries are keyed under.
+    """
+    model_name, metadata = item
+    # The record and table share the same metadata; serialize and hash it once
+    # for both cache keys instead of per model class.
+    digest = metadata_digest(metadata)
+    RecordModel(model_name, metadata, digest=digest).create()
+    # Pure-data models expose no methods and get no table module; skip the
+    # construction and cache probe instead of letting generate_ast bail out.
+    if metadata["methods"]:
+        TableModel(model_name, metadata, digest=digest).create()
+    return digest
+
+
 def run(ignore_errors: bool = False) -> None:
     """Run the model generation.
 
     Args:
         fail_on_error: Fail gracelessly when a model generation error is encountered
     """
+    CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+
     model_metadata = get_all_model_metadata()
 
-    # Create the base model.
-    BaseModel(BASE_MODEL_NAME, model_metadata["ir.model"]).create()
+    # Short-circuit the whole run when nothing upstream changed: a single
+    # digest over the full metadata (plus the package version, so upgrades
+    # regenerate) is compared against the manifest left by the last
+    # successful run.
+    manifest_digest = hashlib.sha256(
+        (json.dumps(model_metadata, sort_keys=True, default=str) + __version__).encode()
+    ).hexdigest()
+    manifest = MODEL_DIRECTORY / ".manifest.sha"
+    if manifest.exists() and manifest.read_text() == manifest_digest:
+        print("Models are up to date; nothing to generate.")
+        return
 
-    type_models: List[Type[Model]] = [RecordModel, TableModel]
+    # Create the base model.
+    base_model = BaseModel(BASE_MODEL_NAME, model_metadata["ir.model"])
+    base_model.create()
 
     with DisplayHandler(len(model_metadata)) as handler:
+        generatable = []
         for model_name, metadata in model_metadata.items():
             if not metadata:
                 handler.ignore(model_name)
-                continue
-            try:
-                for type_model in type_models:
-                    type_model(model_name, metadata).create()
-            except:  # noqa: E722
-                if not ignore_errors:
-                    raise
-                handler.error(model_name)
             else:
-                handler.success(model_name)
+                generatable.append((model_name, metadata))
+
+        # Each model's generation is independent pure-Python CPU work, so fan it
+        # out across processes to sidestep the GIL.
+        digests: Dict[str, str] = {}
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {executor.submit(process_model, item): item[0] for item in generatable}
+            for future in as_completed(futures):
+                model_name = futures[future]
+                try:
+                    digests[model_name] = future.result()
+                except:  # noqa: E722
+                    if not ignore_errors:
+                        raise
+                    handler.error(model_name)
+                else:
+                    handler.success(model_name)
 
         # Create the TypedZERP model using only the models that were successfully generated.
-        filtered_model_metadata = {model: model_metadata[model] for model in handler.successes}
-        TypedZERPModel("TypedZERPModel", filtered_model_metadata).create()
+        successes = set(handler.successes)
+        filtered_model_metadata = {
+            model: model_metadata[model] for model in model_metadata if model in successes
+        }
+        typed_model = TypedZERPModel("TypedZERPModel", filtered_model_metadata)
+        typed_model.create()
+
+    # Drop files for models the upstream database no longer has, so renames
+    # and removals don't leave importable stale modules behind.
+    expected_filenames = set()
+    for model_name, metadata in model_metadata.items():
+        if not metadata:
+            continue
+        expected_filenames.add(make_read_model_classname(model_name) + ".py")
+        if metadata["methods"]:
+            expected_filenames.add(make_model_classname(model_name) + ".py")
+    prune_stale_models(expected_filenames)
+
+    # Same for the source cache: keep only the entries this run's digests
+    # touched, so superseded metadata doesn't pile up old sources.
+    expected_cache = {base_model.cache_key() + ".src", typed_model.cache_key() + ".src"}
+    for model_name, digest in digests.items():
+        metadata = model_metadata[model_name]
+        expected_cache.add(RecordModel(model_name, metadata, digest=digest).cache_key() + ".src")
+        if metadata["methods"]:
+            expected_cache.add(TableModel(model_name, metadata, digest=digest).cache_key() + ".src")
+    prune_stale_cache(expected_cache)
+
+    # Only stamp the manifest once everything above completed cleanly, so a
+    # failed or interrupted run is retried in full next time.
+    if not handler.progress.errors:
+        manifest.write_text(manifest_digest)
 
 
 if __name__ == "__main__":
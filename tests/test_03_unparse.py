@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import ast
+
+
+def test_unparse_without_locations():
+    """ast.unparse must accept the location-less modules our generators build.
+
+    The generators skip ast.fix_missing_locations entirely and only mark the
+    statements ast.unparse actually reads (those that may carry a type
+    comment: FunctionDef / Assign), the way set_required_locations does.
+    """
+    assign = ast.Assign(
+        targets=[ast.Name(id='fields_thing_record', ctx=ast.Store())],
+        value=ast.Constant(value='name'),
+    )
+    # What set_required_locations stamps onto type-comment-capable statements.
+    assign.lineno = 1
+    assign.type_comment = None
+
+    module = ast.Module(
+        body=[
+            ast.ImportFrom(
+                module='typing',
+                names=[ast.alias(name='TypedDict', asname=None)],
+                level=0,
+            ),
+            assign,
+            ast.ClassDef(
+                name='thing_record',
+                bases=[ast.Name(id='TypedDict', ctx=ast.Load())],
+                keywords=[],
+                body=[
+                    ast.AnnAssign(
+                        target=ast.Name(id='name', ctx=ast.Store()),
+                        annotation=ast.Name(id='str', ctx=ast.Load()),
+                        value=None,
+                        simple=1,
+                    ),
+                ],
+                decorator_list=[],
+            ),
+        ],
+        type_ignores=[],
+    )
+
+    source = ast.unparse(module)
+    assert 'class thing_record(TypedDict):' in source
+    assert 'name: str' in source
+
+
+if __name__ == '__main__':
+    test_unparse_without_locations()